@@ -6,305 +6,585 @@ Optimized version with concurrent requests.
 """
 
 import os
+import re
+import sys
 import json
+import time
+import random
 import asyncio
 from datetime import datetime
-from typing import Dict, Any, List
-from openai import AsyncOpenAI
-from dotenv import load_dotenv
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
+from openai import AsyncOpenAI, APIConnectionError, RateLimitError
 import httpx
 
-# Load environment variables
-load_dotenv()
+# orjson parses and encodes JSON several times faster than stdlib json;
+# fall back silently since it is not part of the locked dependency set
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# HTTP/2 lets all concurrent requests multiplex over a single TLS connection,
+# but httpx only enables it when the optional h2 package is installed
+try:
+    import h2  # noqa: F401
+
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# The openai SDK can run on an aiohttp transport, which degrades much less
+# than httpx under heavy request concurrency. The real client needs the
+# httpx-aiohttp bridge (the SDK's 'aiohttp' extra); without it the SDK
+# still exports DefaultAioHttpClient as a placeholder that raises on
+# construction, so gate on the bridge package itself and fall back to the
+# shared httpx client when it is not installed
+try:
+    import httpx_aiohttp  # noqa: F401
+    from openai import DefaultAioHttpClient
+except ImportError:
+    DefaultAioHttpClient = None
+
+# How long a cached provider list stays valid; provider line-ups change
+# rarely, so a day-old lookup is still good enough for routing probes.
+# Cached lookups are persisted to disk so repeat runs during development
+# skip the endpoints round trips entirely.
+PROVIDERS_CACHE_TTL = 86400.0
+PROVIDERS_CACHE_FILE = ".endpoints_cache.json"
+
+# Last-known tool-support outcome per model/provider pair. Pairs that
+# failed every run last time get a single confirmation run on the next
+# invocation instead of three; pass --full to force three runs everywhere.
+SUPPORT_CACHE_FILE = ".support_cache.json"
+
+# Explicit timeouts so a hung provider cannot stall the run indefinitely;
+# the read budget is generous because some probes legitimately generate
+# for a long time before finishing
+CONNECT_TIMEOUT = 10.0
+REQUEST_TIMEOUT = 120.0
+
+# Retry policy for transient endpoints-API failures
+MAX_FETCH_RETRIES = 3
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Retry policy for the completion probes themselves: rate limits and
+# connection drops get a couple of quick retries so a transient blip does
+# not burn one of the three runs, while real API errors fail immediately
+# and count as the result they are
+MAX_PROBE_RETRIES = 3
+PROBE_RETRY_BASE_DELAY = 0.25
+
+# Error messages that indicate the provider rejected the tools payload
+# outright; precompiled so classification is a single scan of the message
+_TOOL_ERR_RE = re.compile(r"tool|function", re.IGNORECASE)
+_STRUCTURED_ERR_RE = re.compile(
+    r"response_format|json_schema|not supported|invalid", re.IGNORECASE
+)
+
+# Request payloads are identical for every probe, so build them once at
+# module scope instead of allocating fresh dicts per call
+WEATHER_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "get_weather",
+        "description": "Get the current weather in a given location",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "The city and state, e.g. San Francisco, CA",
+                },
+                "unit": {
+                    "type": "string",
+                    "enum": ["celsius", "fahrenheit"],
+                    "description": "The unit of temperature",
+                },
+            },
+            "required": ["location"],
+        },
+    },
+}
+
+TOOL_MESSAGES = [
+    {
+        "role": "user",
+        "content": "What's the weather like in San Francisco?",
+    }
+]
+
+STRUCTURED_MESSAGES = [
+    {
+        "role": "user",
+        "content": "What's the weather like in London?",
+    }
+]
+
+WEATHER_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "weather",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "City or location name",
+                },
+                "temperature": {
+                    "type": "number",
+                    "description": "Temperature in Celsius",
+                },
+                "conditions": {
+                    "type": "string",
+                    "description": "Weather conditions description",
+                },
+            },
+            "required": ["location", "temperature", "conditions"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+MAX_TOKENS = 1000
+
+
+# Per-run results are allocated 3 x providers x models times per pass;
+# slotted dataclasses are roughly half the size of the equivalent dict and
+# give cheaper attribute access, and they convert to plain dicts only once
+# at aggregation time
+@dataclass(slots=True)
+class ToolRunResult:
+    """Outcome of a single tool-calling probe against one provider."""
+
+    model_id: str
+    provider_name: str
+    display_name: str
+    supports_tools: Optional[bool] = False
+    tool_call_made: bool = False
+    status: str = "unknown"  # "success", "error", "unclear", "no_tool_call"
+    error: Optional[str] = None
+    response_content: Optional[str] = None
+    tool_calls: Optional[List[Dict[str, Any]]] = None
+    finish_reason: Optional[str] = None
+    model_used: Optional[str] = None
+    timestamp: str = ""
+
+
+@dataclass(slots=True)
+class StructuredRunResult:
+    """Outcome of a single structured-output probe against one provider."""
+
+    model_id: str
+    provider_name: str
+    display_name: str
+    supports_structured_output: Optional[bool] = False
+    status: str = "unknown"  # "success", "error", "unclear"
+    error: Optional[str] = None
+    response_content: Optional[str] = None
+    finish_reason: Optional[str] = None
+    model_used: Optional[str] = None
+    timestamp: str = ""
+
+
+@lru_cache(maxsize=None)
+def split_model_id(model_id: str):
+    """Split a model id into (author, slug), or None if malformed.
+
+    Cached because the same ids are re-split on every lookup across the
+    two check passes.
+    """
+    author, sep, slug = model_id.partition("/")
+    if not sep or not author or "/" in slug:
+        return None
+    return author, slug
+
+
+@lru_cache(maxsize=None)
+def provider_extra_body(provider_name: str) -> Dict[str, Any]:
+    """Routing payload that pins a request to one provider, memoized per provider."""
+    return {"provider": {"only": [provider_name]}}
 
 
 class OpenRouterToolSupportChecker:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, full_run: bool = False):
         self.api_key = api_key
+        self.full_run = full_run
         self.base_url = "https://openrouter.ai/api/v1"
+        # Shared HTTP client so every request reuses one connection pool
+        # instead of paying a fresh TLS handshake per call
+        self.http_client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=20),
+            timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+        )
+        # Completions prefer the aiohttp transport when available; the
+        # endpoints lookups stay on the shared httpx client either way.
+        # The timeout and pool budgets are passed explicitly so the
+        # transport swap keeps the same bounds as the shared client
+        if DefaultAioHttpClient is not None:
+            completion_http_client = DefaultAioHttpClient(
+                timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT),
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=20),
+            )
+        else:
+            completion_http_client = self.http_client
         self.client = AsyncOpenAI(
             api_key=api_key,
             base_url=self.base_url,
+            http_client=completion_http_client,
         )
         # Semaphore to limit concurrent requests
-        self.semaphore = asyncio.Semaphore(5)
+        self.semaphore = asyncio.Semaphore(16)
+        # In-flight provider lookups, so concurrent callers share one request
+        self._providers_inflight: Dict[str, asyncio.Task] = {}
+        # Completed provider lookups as (fetched_at, providers), reused
+        # until the TTL expires; seeded from the on-disk cache of the
+        # previous run. Wall-clock timestamps so entries survive restarts.
+        self._providers_cache: Dict[str, tuple] = self._load_providers_cache()
+        # Known tool-support outcomes from the previous run
+        self._support_cache: Dict[str, Dict[str, Any]] = self._load_support_cache()
+
+    def _load_providers_cache(self) -> Dict[str, tuple]:
+        """Load the persisted provider cache, dropping expired entries."""
+        try:
+            with open(PROVIDERS_CACHE_FILE, "rb") as f:
+                raw = orjson.loads(f.read()) if orjson is not None else json.load(f)
+        except (OSError, ValueError):
+            return {}
+        now = time.time()
+        return {
+            model_id: (fetched_at, providers)
+            for model_id, (fetched_at, providers) in raw.items()
+            if now - fetched_at < PROVIDERS_CACHE_TTL
+        }
+
+    def _save_providers_cache(self) -> None:
+        """Persist the provider cache atomically so a crash can't corrupt it."""
+        tmp_path = PROVIDERS_CACHE_FILE + ".tmp"
+        try:
+            if orjson is not None:
+                with open(tmp_path, "wb") as f:
+                    f.write(orjson.dumps(self._providers_cache))
+            else:
+                with open(tmp_path, "w") as f:
+                    json.dump(self._providers_cache, f)
+            os.replace(tmp_path, PROVIDERS_CACHE_FILE)
+        except OSError:
+            # The cache is an optimization; never let it break a run
+            pass
+
+    def _load_support_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Load last-known support outcomes from the previous run."""
+        try:
+            with open(SUPPORT_CACHE_FILE, "rb") as f:
+                return orjson.loads(f.read()) if orjson is not None else json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_support_cache(self) -> None:
+        """Persist support outcomes atomically; failures are non-fatal."""
+        tmp_path = SUPPORT_CACHE_FILE + ".tmp"
+        try:
+            if orjson is not None:
+                with open(tmp_path, "wb") as f:
+                    f.write(orjson.dumps(self._support_cache))
+            else:
+                with open(tmp_path, "w") as f:
+                    json.dump(self._support_cache, f)
+            os.replace(tmp_path, SUPPORT_CACHE_FILE)
+        except OSError:
+            pass
+
+    def _runs_for_provider(self, model_id: str, provider_name: str) -> int:
+        """How many tool-support runs this provider gets.
+
+        Known negatives (zero successes last run) only need one
+        confirmation run; everything else, including known positives,
+        keeps three runs so regressions still show up.
+        """
+        if self.full_run:
+            return 3
+        cached = self._support_cache.get(f"{model_id}|{provider_name}")
+        if cached is not None and cached.get("status") == "negative":
+            return 1
+        return 3
+
+    async def aclose(self):
+        """Close the completion transport and the shared HTTP client."""
+        await self.client.close()
+        if not self.http_client.is_closed:
+            await self.http_client.aclose()
 
     async def get_model_providers(self, model_id: str) -> List[Dict[str, str]]:
-        """Fetch available providers for a specific model."""
-        async with httpx.AsyncClient() as client:
-            try:
-                # Split model ID to get author and slug
-                parts = model_id.split("/")
-                if len(parts) != 2:
-                    print(f"Invalid model ID format: {model_id}")
-                    return []
-
-                author, slug = parts
-
-                # Get provider information from the endpoints API
-                response = await client.get(
-                    f"{self.base_url}/models/{author}/{slug}/endpoints",
-                    headers={"Authorization": f"Bearer {self.api_key}"},
-                )
+        """Fetch available providers for a specific model.
+
+        The tool support and structured output checks for a model run
+        concurrently and both need the provider list, so identical lookups
+        are coalesced into a single in-flight request and completed results
+        are cached until PROVIDERS_CACHE_TTL expires. Only provider metadata
+        is cached; completion probes always hit the live API.
+        """
+        cached = self._providers_cache.get(model_id)
+        if cached is not None:
+            fetched_at, providers = cached
+            if time.time() - fetched_at < PROVIDERS_CACHE_TTL:
+                return providers
 
-                if response.status_code != 200:
-                    print(
-                        f"Failed to fetch endpoints for {model_id}: {response.status_code}"
+        task = self._providers_inflight.get(model_id)
+        if task is not None:
+            return await task
+
+        task = asyncio.create_task(self._fetch_model_providers(model_id))
+        self._providers_inflight[model_id] = task
+        try:
+            providers = await task
+        finally:
+            self._providers_inflight.pop(model_id, None)
+
+        # Don't cache empty results so a transient failure can be retried
+        if providers:
+            self._providers_cache[model_id] = (time.time(), providers)
+            self._save_providers_cache()
+        return providers
+
+    async def _fetch_model_providers(self, model_id: str) -> List[Dict[str, str]]:
+        """Fetch the provider list for a model from the endpoints API."""
+        try:
+            # Split model ID to get author and slug; ids are validated once
+            # at load time in main, so a malformed one cannot reach here
+            author, slug = split_model_id(model_id)
+
+            # Get provider information from the endpoints API, retrying
+            # transient failures with exponential backoff and jitter
+            for attempt in range(MAX_FETCH_RETRIES):
+                if attempt:
+                    delay = min(
+                        RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (attempt - 1)
                     )
-                    return []
+                    await asyncio.sleep(delay * (1 + random.uniform(0, 0.5)))
 
-                data = response.json()
-                providers = []
-
-                # Extract provider information from endpoints
-                if "data" in data and "endpoints" in data["data"]:
-                    for endpoint in data["data"]["endpoints"]:
-                        provider_info = {
-                            "provider_name": endpoint.get("provider_name", ""),
-                            "display_name": endpoint.get("name", ""),
-                            "context_length": endpoint.get("context_length", 0),
-                            "has_pricing": "pricing" in endpoint,
-                        }
-
-                        # Only add if we have a valid provider name
-                        if provider_info["provider_name"]:
-                            providers.append(provider_info)
+                try:
+                    response = await self.http_client.get(
+                        f"/models/{author}/{slug}/endpoints"
+                    )
+                except httpx.TransportError:
+                    if attempt == MAX_FETCH_RETRIES - 1:
+                        raise
+                    continue
 
-                return providers
-            except Exception as e:
-                print(f"Error getting providers for {model_id}: {e}")
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    break
+
+            if response.status_code != 200:
+                print(
+                    f"Failed to fetch endpoints for {model_id}: {response.status_code}"
+                )
                 return []
 
+            if orjson is not None:
+                data = orjson.loads(response.content)
+            else:
+                data = response.json()
+            providers = []
+
+            # Extract provider information from endpoints
+            if "data" in data and "endpoints" in data["data"]:
+                for endpoint in data["data"]["endpoints"]:
+                    provider_info = {
+                        "provider_name": endpoint.get("provider_name", ""),
+                        "display_name": endpoint.get("name", ""),
+                        "context_length": endpoint.get("context_length", 0),
+                        "has_pricing": "pricing" in endpoint,
+                    }
+
+                    # Only add if we have a valid provider name
+                    if provider_info["provider_name"]:
+                        providers.append(provider_info)
+
+            return providers
+        except Exception as e:
+            print(f"Error getting providers for {model_id}: {e}")
+            return []
+
     async def test_provider(
-        self, model_id: str, provider: Dict[str, Any]
-    ) -> Dict[str, Any]:
+        self, model_id: str, provider: Dict[str, Any], timestamp: str
+    ) -> ToolRunResult:
         """Test if a specific provider supports tool calling."""
         provider_name = provider["provider_name"]
         display_name = provider.get("display_name", provider_name)
 
-        result = {
-            "model_id": model_id,
-            "provider_name": provider_name,
-            "display_name": display_name,
-            "supports_tools": provider.get("supports_tools", False),
-            "tool_call_made": False,
-            "status": "unknown",  # "success", "error", "unclear", "no_tool_call"
-            "error": None,
-            "response_content": None,
-            "tool_calls": None,
-            "finish_reason": None,
-            "model_used": None,
-            "timestamp": datetime.now().isoformat(),
-        }
+        result = ToolRunResult(
+            model_id=model_id,
+            provider_name=provider_name,
+            display_name=display_name,
+            supports_tools=provider.get("supports_tools", False),
+            timestamp=timestamp,
+        )
 
         async with self.semaphore:  # Limit concurrent requests
             try:
-                # Create the completion with tools
-                response = await self.client.chat.completions.create(
-                    model=model_id,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": "What's the weather like in San Francisco?",
-                        }
-                    ],
-                    tools=[
-                        {
-                            "type": "function",
-                            "function": {
-                                "name": "get_weather",
-                                "description": "Get the current weather in a given location",
-                                "parameters": {
-                                    "type": "object",
-                                    "properties": {
-                                        "location": {
-                                            "type": "string",
-                                            "description": "The city and state, e.g. San Francisco, CA",
-                                        },
-                                        "unit": {
-                                            "type": "string",
-                                            "enum": ["celsius", "fahrenheit"],
-                                            "description": "The unit of temperature",
-                                        },
-                                    },
-                                    "required": ["location"],
-                                },
-                            },
-                        }
-                    ],
-                    max_tokens=1000,
-                    # Specify the provider using extra_body
-                    extra_body={"provider": {"only": [provider_name]}},
-                )
+                # Create the completion with tools, retrying transient
+                # failures with exponential backoff and a little jitter
+                for attempt in range(MAX_PROBE_RETRIES):
+                    try:
+                        response = await self.client.chat.completions.create(
+                            model=model_id,
+                            messages=TOOL_MESSAGES,
+                            tools=[WEATHER_TOOL],
+                            max_tokens=MAX_TOKENS,
+                            # Specify the provider using extra_body
+                            extra_body=provider_extra_body(provider_name),
+                        )
+                        break
+                    except (RateLimitError, APIConnectionError):
+                        if attempt == MAX_PROBE_RETRIES - 1:
+                            raise
+                        await asyncio.sleep(
+                            PROBE_RETRY_BASE_DELAY * 2**attempt
+                            + random.uniform(0, 0.1)
+                        )
 
                 # Extract debugging information
                 message = response.choices[0].message
-                result["finish_reason"] = response.choices[0].finish_reason
-                result["model_used"] = (
+                result.finish_reason = response.choices[0].finish_reason
+                result.model_used = (
                     response.model if hasattr(response, "model") else None
                 )
 
                 # Check if the model made a tool call
                 if hasattr(message, "tool_calls") and message.tool_calls:
-                    result["tool_calls"] = [
-                        {
-                            "id": tc.id,
-                            "type": tc.type,
-                            "function": {
-                                "name": tc.function.name,
-                                "arguments": tc.function.arguments,
-                            },
-                        }
-                        for tc in message.tool_calls
+                    # The SDK objects are pydantic models; dump them directly
+                    # instead of mirroring their fields by hand
+                    result.tool_calls = [
+                        tc.model_dump() for tc in message.tool_calls
                     ]
-                    result["tool_call_made"] = True
-                    result["status"] = "success"
-                    result["supports_tools"] = True
+                    result.tool_call_made = True
+                    result.status = "success"
+                    result.supports_tools = True
                 elif message.content:
-                    result["response_content"] = message.content
-                    result["tool_call_made"] = False
-                    result["status"] = "no_tool_call"
-                    result["supports_tools"] = False
+                    result.response_content = message.content
+                    result.tool_call_made = False
+                    result.status = "no_tool_call"
+                    result.supports_tools = False
                 else:
-                    result["status"] = "unclear"
-                    result["supports_tools"] = None
+                    result.status = "unclear"
+                    result.supports_tools = None
 
             except Exception as e:
                 error_str = str(e)
-                result["error"] = error_str
-                result["status"] = "error"
+                result.error = error_str
+                result.status = "error"
 
                 # Analyze error type
-                if "tool" in error_str.lower() or "function" in error_str.lower():
-                    result["supports_tools"] = False
+                if _TOOL_ERR_RE.search(error_str):
+                    result.supports_tools = False
                 elif "404" in error_str and "No endpoints found" in error_str:
-                    result["supports_tools"] = False
+                    result.supports_tools = False
                 else:
                     # Other errors - unclear if tools are supported
-                    result["supports_tools"] = None
+                    result.supports_tools = None
 
             return result
 
     async def test_provider_structured_output(
-        self, model_id: str, provider: Dict[str, Any]
-    ) -> Dict[str, Any]:
+        self, model_id: str, provider: Dict[str, Any], timestamp: str
+    ) -> StructuredRunResult:
         """Test if a specific provider supports structured output."""
         provider_name = provider["provider_name"]
         display_name = provider.get("display_name", provider_name)
 
-        result = {
-            "model_id": model_id,
-            "provider_name": provider_name,
-            "display_name": display_name,
-            "supports_structured_output": False,
-            "status": "unknown",  # "success", "error", "unclear"
-            "error": None,
-            "response_content": None,
-            "finish_reason": None,
-            "model_used": None,
-            "timestamp": datetime.now().isoformat(),
-        }
+        result = StructuredRunResult(
+            model_id=model_id,
+            provider_name=provider_name,
+            display_name=display_name,
+            timestamp=timestamp,
+        )
 
         async with self.semaphore:  # Limit concurrent requests
             try:
-                # Create the completion with provider routing and structured output format
-                response = await self.client.chat.completions.create(
-                    model=model_id,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": "What's the weather like in London?",
-                        }
-                    ],
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": "weather",
-                            "strict": True,
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "location": {
-                                        "type": "string",
-                                        "description": "City or location name",
-                                    },
-                                    "temperature": {
-                                        "type": "number",
-                                        "description": "Temperature in Celsius",
-                                    },
-                                    "conditions": {
-                                        "type": "string",
-                                        "description": "Weather conditions description",
-                                    },
-                                },
-                                "required": ["location", "temperature", "conditions"],
-                                "additionalProperties": False,
-                            },
-                        },
-                    },
-                    max_tokens=1000,
-                    # Specify the provider using extra_body
-                    extra_body={"provider": {"only": [provider_name]}},
-                )
+                # Create the completion with provider routing and structured
+                # output format, retrying transient failures with backoff
+                for attempt in range(MAX_PROBE_RETRIES):
+                    try:
+                        response = await self.client.chat.completions.create(
+                            model=model_id,
+                            messages=STRUCTURED_MESSAGES,
+                            response_format=WEATHER_RESPONSE_FORMAT,
+                            max_tokens=MAX_TOKENS,
+                            # Specify the provider using extra_body
+                            extra_body=provider_extra_body(provider_name),
+                        )
+                        break
+                    except (RateLimitError, APIConnectionError):
+                        if attempt == MAX_PROBE_RETRIES - 1:
+                            raise
+                        await asyncio.sleep(
+                            PROBE_RETRY_BASE_DELAY * 2**attempt
+                            + random.uniform(0, 0.1)
+                        )
 
                 # Extract debugging information
                 message = response.choices[0].message
-                result["finish_reason"] = response.choices[0].finish_reason
-                result["model_used"] = (
+                result.finish_reason = response.choices[0].finish_reason
+                result.model_used = (
                     response.model if hasattr(response, "model") else None
                 )
 
                 # Check if the model returned valid JSON according to our schema
                 if message.content:
-                    result["response_content"] = message.content
+                    result.response_content = message.content
                     try:
                         json_response = json.loads(message.content)
                         if all(
                             key in json_response
                             for key in ["location", "temperature", "conditions"]
                         ):
-                            result["supports_structured_output"] = True
-                            result["status"] = "success"
+                            result.supports_structured_output = True
+                            result.status = "success"
                         else:
-                            result["supports_structured_output"] = False
-                            result["status"] = "invalid_schema"
+                            result.supports_structured_output = False
+                            result.status = "invalid_schema"
                     except json.JSONDecodeError:
-                        result["supports_structured_output"] = False
-                        result["status"] = "invalid_json"
+                        result.supports_structured_output = False
+                        result.status = "invalid_json"
                 else:
-                    result["status"] = "unclear"
-                    result["supports_structured_output"] = None
+                    result.status = "unclear"
+                    result.supports_structured_output = None
 
             except Exception as e:
                 error_str = str(e)
-                result["error"] = error_str
-                result["status"] = "error"
+                result.error = error_str
+                result.status = "error"
 
                 # Analyze error type
-                if any(
-                    keyword in error_str.lower()
-                    for keyword in [
-                        "response_format",
-                        "json_schema",
-                        "not supported",
-                        "invalid",
-                    ]
-                ):
-                    result["supports_structured_output"] = False
+                if _STRUCTURED_ERR_RE.search(error_str):
+                    result.supports_structured_output = False
                 else:
                     # Other errors - unclear if structured output is supported
-                    result["supports_structured_output"] = None
+                    result.supports_structured_output = None
 
             return result
 
-    async def check_model_structured_output(self, model_id: str) -> Dict[str, Any]:
+    async def check_model_structured_output(
+        self, model_id: str, providers: List[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
         """Check all providers for structured output support for a specific model."""
         print(f"\n{'=' * 60}")
         print(f"Checking structured output support for model: {model_id}")
         print(f"{'=' * 60}")
 
-        # Get providers for this model
-        providers = await self.get_model_providers(model_id)
+        # Use the pre-fetched provider list when the caller has one
+        if providers is None:
+            providers = await self.get_model_providers(model_id)
 
         if not providers:
             print(f"No providers found for {model_id}")
@@ -317,12 +597,18 @@ class OpenRouterToolSupportChecker:
 
         print(f"Found {len(providers)} providers")
 
+        # One timestamp for the whole batch; formatting datetimes per run
+        # adds up across thousands of concurrent probes
+        timestamp = datetime.now().isoformat()
+
         # Create all test tasks
         tasks = []
         for provider in providers:
             # Create 3 test tasks for each provider
             for run in range(3):
-                task = self.test_provider_structured_output(model_id, provider)
+                task = self.test_provider_structured_output(
+                    model_id, provider, timestamp
+                )
                 tasks.append((provider, run, task))
 
         print(f"Running {len(tasks)} structured output tests concurrently...")
@@ -342,32 +628,37 @@ class OpenRouterToolSupportChecker:
             provider_results[provider_name]["test_runs"].append(results[i])
 
         # Process and format results
+        n_providers = len(providers)
         final_results = []
         for i, (provider_name, data) in enumerate(provider_results.items(), 1):
             provider = data["provider"]
             test_runs = data["test_runs"]
             display_name = provider.get("display_name", provider_name)
 
-            # Calculate summary
-            success_count = sum(1 for r in test_runs if r["status"] == "success")
-            error_count = sum(1 for r in test_runs if r["status"] == "error")
-            unclear_count = sum(1 for r in test_runs if r["status"] == "unclear")
+            # Calculate summary in a single pass over the runs
+            status_counts = Counter(r.status for r in test_runs)
+            success_count = status_counts["success"]
+            error_count = status_counts["error"]
+            unclear_count = status_counts["unclear"]
             fail_count = 3 - success_count - error_count - unclear_count
 
-            # Display results
-            print(f"\n[{i}/{len(providers)}] {display_name}:")
-            print(f"  Summary: {success_count}/3 successful")
+            # Display results with a single write per provider
+            lines = [
+                f"\n[{i}/{n_providers}] {display_name}:",
+                f"  Summary: {success_count}/3 successful",
+            ]
             if error_count > 0:
-                print(f"  Errors: {error_count}/3")
+                lines.append(f"  Errors: {error_count}/3")
             if unclear_count > 0:
-                print(f"  Unclear: {unclear_count}/3")
+                lines.append(f"  Unclear: {unclear_count}/3")
+            print("\n".join(lines))
 
             final_results.append(
                 {
                     "model_id": model_id,
                     "provider_name": provider_name,
                     "display_name": display_name,
-                    "test_runs": test_runs,
+                    "test_runs": [asdict(r) for r in test_runs],
                     "summary": {
                         "total_runs": 3,
                         "success_count": success_count,
@@ -375,25 +666,28 @@ class OpenRouterToolSupportChecker:
                         "unclear_count": unclear_count,
                         "fail_count": fail_count,
                     },
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": timestamp,
                 }
             )
 
         return {
             "model_id": model_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "providers_tested": len(providers),
             "providers": final_results,
         }
 
-    async def check_model(self, model_id: str) -> Dict[str, Any]:
+    async def check_model(
+        self, model_id: str, providers: List[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
         """Check all providers for a specific model."""
         print(f"\n{'=' * 60}")
         print(f"Checking model: {model_id}")
         print(f"{'=' * 60}")
 
-        # Get providers for this model
-        providers = await self.get_model_providers(model_id)
+        # Use the pre-fetched provider list when the caller has one
+        if providers is None:
+            providers = await self.get_model_providers(model_id)
 
         if not providers:
             print(f"No providers found for {model_id}")
@@ -406,12 +700,17 @@ class OpenRouterToolSupportChecker:
 
         print(f"Found {len(providers)} providers")
 
-        # Create all test tasks
+        # One timestamp for the whole batch; formatting datetimes per run
+        # adds up across thousands of concurrent probes
+        timestamp = datetime.now().isoformat()
+
+        # Create all test tasks; known-negative providers get a single
+        # confirmation run instead of three
         tasks = []
         for provider in providers:
-            # Create 3 test tasks for each provider
-            for run in range(3):
-                task = self.test_provider(model_id, provider)
+            n_runs = self._runs_for_provider(model_id, provider["provider_name"])
+            for run in range(n_runs):
+                task = self.test_provider(model_id, provider, timestamp)
                 tasks.append((provider, run, task))
 
         print(f"Running {len(tasks)} tests concurrently...")
@@ -431,62 +730,80 @@ class OpenRouterToolSupportChecker:
             provider_results[provider_name]["test_runs"].append(results[i])
 
         # Process and format results
+        n_providers = len(providers)
         final_results = []
         for i, (provider_name, data) in enumerate(provider_results.items(), 1):
             provider = data["provider"]
             test_runs = data["test_runs"]
             display_name = provider.get("display_name", provider_name)
 
-            # Calculate summary
-            success_count = sum(1 for r in test_runs if r["status"] == "success")
-            error_count = sum(1 for r in test_runs if r["status"] == "error")
-            unclear_count = sum(1 for r in test_runs if r["status"] == "unclear")
-            no_tool_call_count = sum(
-                1 for r in test_runs if r["status"] == "no_tool_call"
-            )
+            # Calculate summary in a single pass over the runs
+            n_runs = len(test_runs)
+            status_counts = Counter(r.status for r in test_runs)
+            success_count = status_counts["success"]
+            error_count = status_counts["error"]
+            unclear_count = status_counts["unclear"]
+            no_tool_call_count = status_counts["no_tool_call"]
+
+            # Remember the outcome so the next run can shorten retests of
+            # providers that failed across the board
+            self._support_cache[f"{model_id}|{provider_name}"] = {
+                "status": "negative" if success_count == 0 else "positive",
+                "stamp": timestamp,
+            }
 
-            # Display results
-            print(f"\n[{i}/{len(providers)}] {display_name}:")
-            print(f"  Summary: {success_count}/3 successful")
+            # Display results with a single write per provider
+            lines = [
+                f"\n[{i}/{n_providers}] {display_name}:",
+                f"  Summary: {success_count}/{n_runs} successful",
+            ]
             if error_count > 0:
-                print(f"  Errors: {error_count}/3")
+                lines.append(f"  Errors: {error_count}/{n_runs}")
             if unclear_count > 0:
-                print(f"  Unclear: {unclear_count}/3")
+                lines.append(f"  Unclear: {unclear_count}/{n_runs}")
+            print("\n".join(lines))
 
             final_results.append(
                 {
                     "model_id": model_id,
                     "provider_name": provider_name,
                     "display_name": display_name,
-                    "test_runs": test_runs,
+                    "test_runs": [asdict(r) for r in test_runs],
                     "summary": {
-                        "total_runs": 3,
+                        "total_runs": n_runs,
                         "success_count": success_count,
                         "error_count": error_count,
                         "unclear_count": unclear_count,
                         "no_tool_call_count": no_tool_call_count,
                     },
-                    "timestamp": datetime.now().isoformat(),
+                    "timestamp": timestamp,
                 }
             )
 
+        self._save_support_cache()
+
         return {
             "model_id": model_id,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "providers_tested": len(providers),
             "providers": final_results,
         }
 
 
 async def main():
+    # Load .env only when actually running checks, not on import
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
     api_key = os.getenv("OPENROUTER_API_KEY")
     if not api_key:
         print("Error: OPENROUTER_API_KEY environment variable not set")
         return
 
     # Load models from unified models file
-    with open("models.json", "r") as f:
-        models_data = json.load(f)
+    with open("models.json", "rb") as f:
+        models_data = orjson.loads(f.read()) if orjson is not None else json.load(f)
     
     # Extract OpenRouter models
     models = []
@@ -494,11 +811,30 @@ async def main():
         if "openrouter" in platforms and platforms["openrouter"]:
             models.extend(platforms["openrouter"])
 
+    # Validate every id once up-front instead of re-checking per fetch
+    bad_models = [m for m in models if split_model_id(m) is None]
+    if bad_models:
+        print(f"Error: invalid model IDs in models.json: {bad_models}")
+        return
+
     print("OpenRouter Tool Support Checker (Fast Concurrent Version)")
     print(f"Testing {len(models)} models")
     print("=" * 60)
 
-    checker = OpenRouterToolSupportChecker(api_key)
+    # --full forces three runs for every provider, ignoring the
+    # negative-result cache from previous invocations
+    full_run = "--full" in sys.argv[1:]
+    checker = OpenRouterToolSupportChecker(api_key, full_run=full_run)
+
+    # Prefetch every model's provider list concurrently so no check has to
+    # wait on an endpoints lookup mid-run; lookups are cheap metadata GETs
+    # and the shared client pools their connections
+    providers_by_model = dict(
+        zip(
+            models,
+            await asyncio.gather(*(checker.get_model_providers(m) for m in models)),
+        )
+    )
 
     # Check all models
     all_results = {
@@ -507,35 +843,63 @@ async def main():
         "models": [],
     }
 
-    # Process all models concurrently in batches
-    batch_size = 3  # Process 3 models at a time to avoid overwhelming the API
-    for i in range(0, len(models), batch_size):
-        batch = models[i : i + batch_size]
-        print(
-            f"\nProcessing batch {i // batch_size + 1}/{(len(models) + batch_size - 1) // batch_size}"
+    async def run_model(model_id: str) -> Dict[str, Any]:
+        # Run both tool support and structured output tests concurrently
+        providers = providers_by_model.get(model_id)
+        tool_result, structured_result = await asyncio.gather(
+            checker.check_model(model_id, providers),
+            checker.check_model_structured_output(model_id, providers),
         )
 
-        # Create tasks for this batch
-        batch_tasks = []
-        for model_id in batch:
-            # Run both tool support and structured output tests concurrently
-            tool_task = checker.check_model(model_id)
-            structured_task = checker.check_model_structured_output(model_id)
-            batch_tasks.append((model_id, tool_task, structured_task))
-
-        # Execute batch
-        for model_id, tool_task, structured_task in batch_tasks:
-            tool_result = await tool_task
-            structured_result = await structured_task
-
-            # Combine results
-            tool_result["structured_output"] = structured_result["providers"]
-            all_results["models"].append(tool_result)
-
-    # Save final results
+        # Combine results
+        tool_result["structured_output"] = structured_result["providers"]
+        return tool_result
+
+    # Process models through a small worker pool over a queue instead of
+    # fixed batches: a slow model no longer holds up its batch-mates, and
+    # the number of models in flight stays constant (the semaphore still
+    # caps individual requests). TaskGroup propagates worker exceptions
+    # and cancels the rest cleanly. Each finished model is appended to a
+    # JSONL progress log so a crashed run leaves partial results behind;
+    # the full indented data.json is written exactly once at the end.
+    model_queue: asyncio.Queue = asyncio.Queue()
+    for model_id in models:
+        model_queue.put_nowait(model_id)
+
+    max_workers = 3  # Models checked at a time, to avoid overwhelming the API
+
+    with open("data_progress.jsonl", "w") as progress_file:
+
+        async def worker():
+            while True:
+                try:
+                    model_id = model_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                model_result = await run_model(model_id)
+                all_results["models"].append(model_result)
+                progress_file.write(json.dumps(model_result) + "\n")
+                progress_file.flush()
+                print(f"\nFinished {model_result['model_id']}")
+
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(max_workers):
+                tg.create_task(worker())
+
+    await checker.aclose()
+
+    # Save final results; orjson encodes the large nested blob several
+    # times faster than stdlib json. Write to a temp file and rename so a
+    # kill mid-write can never leave a truncated data.json behind.
     final_output = "data.json"
-    with open(final_output, "w") as f:
-        json.dump(all_results, f, indent=2)
+    tmp_output = final_output + ".tmp"
+    if orjson is not None:
+        with open(tmp_output, "wb") as f:
+            f.write(orjson.dumps(all_results, option=orjson.OPT_INDENT_2))
+    else:
+        with open(tmp_output, "w") as f:
+            json.dump(all_results, f, indent=2)
+    os.replace(tmp_output, final_output)
 
     print(f"\n\nResults saved to: {final_output}")
 
@@ -7,27 +7,227 @@ Optimized version with concurrent requests.
 
 import os
 import json
+import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from typing import Dict, Any, List
 from dotenv import load_dotenv
 from huggingface_hub import model_info, InferenceClient
 
+# orjson encodes the large result blob several times faster than stdlib json;
+# fall back silently since it is not part of the locked dependency set
+try:
+    import orjson
+
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
 # Load environment variables
 load_dotenv()
 
+# Map common vendor names to InferenceClient provider names; a single
+# module-level lookup table instead of a dict rebuilt on every test call
+PROVIDER_NAME_MAPPING = {
+    "aws": "aws",
+    "amazon": "aws",
+    "sagemaker": "aws",
+    "azure": "azure",
+    "microsoft": "azure",
+    "together": "together",
+    "replicate": "replicate",
+    "cohere": "cohere",
+    "nebius": "nebius",
+}
+
+# Tool schema used for every tool support probe; built once instead of
+# being re-allocated for each of the 3 runs per provider
+WEATHER_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "get_weather",
+        "description": "Get the current weather in a given location",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "The city and state, e.g. San Francisco, CA",
+                },
+                "unit": {
+                    "type": "string",
+                    "enum": ["celsius", "fahrenheit"],
+                    "description": "The unit of temperature",
+                },
+            },
+            "required": ["location"],
+        },
+    },
+}
+
+# Prompts and schema for the two probes; invariant across calls, so build
+# them once instead of per request
+TOOL_MESSAGES = [
+    {
+        "role": "user",
+        "content": "What's the weather like in San Francisco?",
+    }
+]
+
+STRUCTURED_MESSAGES = [
+    {
+        "role": "user",
+        "content": "What's the weather like in London?",
+    }
+]
+
+WEATHER_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "weather",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "location": {
+                    "type": "string",
+                    "description": "City or location name",
+                },
+                "temperature": {
+                    "type": "number",
+                    "description": "Temperature in Celsius",
+                },
+                "conditions": {
+                    "type": "string",
+                    "description": "Weather conditions description",
+                },
+            },
+            "required": ["location", "temperature", "conditions"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+MAX_TOKENS = 1000
+
+# Explicit request timeout so a hung provider cannot stall the run
+REQUEST_TIMEOUT = 120.0
+
+
+class RateLimiter:
+    """Token-bucket limiter that paces requests to a steady rate."""
+
+    def __init__(self, rate: float, burst: int = 5):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available, refilling at the configured rate."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
 
 class HuggingFaceToolSupportChecker:
     def __init__(self, api_key: str):
         self.api_key = api_key
         # Semaphore to limit concurrent requests
         self.semaphore = asyncio.Semaphore(5)
+        # Token bucket pacing requests to a steady 5/s within the cap above
+        self.rate_limiter = RateLimiter(rate=5.0)
+        # Dedicated bounded pool for the blocking hub calls, instead of
+        # competing for the event loop's shared default executor
+        self._executor = ThreadPoolExecutor(
+            max_workers=8, thread_name_prefix="hf-probe"
+        )
+        # InferenceClient instances keyed by provider, so repeated probes
+        # reuse one client (and its underlying HTTP session) per provider
+        self._clients: Dict[str, InferenceClient] = {}
+        # In-flight provider lookups, so concurrent callers share one request
+        self._providers_inflight: Dict[str, asyncio.Task] = {}
+        # Completed provider lookups, reused for the rest of the run
+        self._providers_cache: Dict[str, List[Dict[str, str]]] = {}
+
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking hub call on the checker's thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, partial(func, *args, **kwargs)
+        )
 
     async def get_model_providers(self, model_id: str) -> List[Dict[str, str]]:
-        """Fetch available providers for a specific model."""
+        """Fetch available providers for a specific model.
+
+        Both the tool support and structured output checks need the provider
+        mapping, so the hub lookup is cached per model for the rest of the run
+        and concurrent lookups for the same model share one in-flight request.
+        """
+        cached = self._providers_cache.get(model_id)
+        if cached is not None:
+            return cached
+
+        task = self._providers_inflight.get(model_id)
+        if task is not None:
+            return await task
+
+        task = asyncio.create_task(self._fetch_model_providers(model_id))
+        self._providers_inflight[model_id] = task
+        try:
+            providers = await task
+        finally:
+            self._providers_inflight.pop(model_id, None)
+
+        # Don't cache empty results so a transient failure can be retried
+        if providers:
+            self._providers_cache[model_id] = providers
+        return providers
+
+    def _get_client(self, provider: Dict[str, Any]) -> InferenceClient:
+        """Return the client for a provider, creating it on first use."""
+        provider_name = provider["provider_name"]
+        if provider_name == "serverless":
+            # Use default HuggingFace serverless API
+            key = "serverless"
+        else:
+            vendor = provider.get("vendor", provider_name).lower()
+            key = PROVIDER_NAME_MAPPING.get(vendor, vendor)
+
+        client = self._clients.get(key)
+        if client is None:
+            if key == "serverless":
+                client = InferenceClient(token=self.api_key, timeout=REQUEST_TIMEOUT)
+            else:
+                try:
+                    client = InferenceClient(
+                        provider=key, token=self.api_key, timeout=REQUEST_TIMEOUT
+                    )
+                except Exception:
+                    # Fallback to serverless if provider is not supported
+                    client = InferenceClient(
+                        token=self.api_key, timeout=REQUEST_TIMEOUT
+                    )
+            self._clients[key] = client
+        return client
+
+    async def _fetch_model_providers(self, model_id: str) -> List[Dict[str, str]]:
+        """Fetch the inference provider mapping for a model from the hub."""
         try:
             # Get model info with inference provider mapping
-            info = await asyncio.to_thread(
+            info = await self._run_blocking(
                 model_info,
                 model_id,
                 expand="inferenceProviderMapping",
@@ -100,77 +300,20 @@ class HuggingFaceToolSupportChecker:
         }
 
         async with self.semaphore:  # Limit concurrent requests
+            # Pace request starts so concurrent batches don't burst the API
+            await self.rate_limiter.acquire()
             try:
-                # Create InferenceClient with provider parameter if not serverless
-                if provider_name == "serverless":
-                    # Use default HuggingFace serverless API
-                    client = InferenceClient(
-                        token=self.api_key,
-                    )
-                else:
-                    # Use specific provider
-                    vendor = provider.get("vendor", provider_name).lower()
-                    # Map common vendor names to InferenceClient provider names
-                    provider_mapping = {
-                        "aws": "aws",
-                        "amazon": "aws",
-                        "sagemaker": "aws",
-                        "azure": "azure",
-                        "microsoft": "azure",
-                        "together": "together",
-                        "replicate": "replicate",
-                        "cohere": "cohere",
-                        "nebius": "nebius",
-                    }
-                    mapped_provider = provider_mapping.get(vendor, vendor)
-                    
-                    try:
-                        client = InferenceClient(
-                            provider=mapped_provider,
-                            token=self.api_key,
-                        )
-                    except Exception:
-                        # Fallback to serverless if provider is not supported
-                        client = InferenceClient(
-                            token=self.api_key,
-                        )
+                # Reuse one InferenceClient per provider
+                client = self._get_client(provider)
 
                 # Create the completion with tools using synchronous call in async context
-                response = await asyncio.to_thread(
+                response = await self._run_blocking(
                     client.chat_completion,
                     model=model_id,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": "What's the weather like in San Francisco?",
-                        }
-                    ],
-                    tools=[
-                        {
-                            "type": "function",
-                            "function": {
-                                "name": "get_weather",
-                                "description": "Get the current weather in a given location",
-                                "parameters": {
-                                    "type": "object",
-                                    "properties": {
-                                        "location": {
-                                            "type": "string",
-                                            "description": "The city and state, e.g. San Francisco, CA",
-                                        },
-                                        "unit": {
-                                            "type": "string",
-                                            "enum": ["celsius", "fahrenheit"],
-                                            "description": "The unit of temperature",
-                                        },
-                                    },
-                                    "required": ["location"],
-                                },
-                            },
-                        }
-                    ],
-                    max_tokens=1000,
-                    )
+                    messages=TOOL_MESSAGES,
+                    tools=[WEATHER_TOOL],
+                    max_tokens=MAX_TOKENS,
+                )
 
                 # Extract debugging information
                 message = response.choices[0].message
@@ -243,79 +386,20 @@ class HuggingFaceToolSupportChecker:
         }
 
         async with self.semaphore:  # Limit concurrent requests
+            # Pace request starts so concurrent batches don't burst the API
+            await self.rate_limiter.acquire()
             try:
-                # Create InferenceClient with provider parameter if not serverless
-                if provider_name == "serverless":
-                    # Use default HuggingFace serverless API
-                    client = InferenceClient(
-                        token=self.api_key,
-                    )
-                else:
-                    # Use specific provider
-                    vendor = provider.get("vendor", provider_name).lower()
-                    # Map common vendor names to InferenceClient provider names
-                    provider_mapping = {
-                        "aws": "aws",
-                        "amazon": "aws",
-                        "sagemaker": "aws",
-                        "azure": "azure",
-                        "microsoft": "azure",
-                        "together": "together",
-                        "replicate": "replicate",
-                        "cohere": "cohere",
-                        "nebius": "nebius",
-                    }
-                    mapped_provider = provider_mapping.get(vendor, vendor)
-                    
-                    try:
-                        client = InferenceClient(
-                            provider=mapped_provider,
-                            token=self.api_key,
-                        )
-                    except Exception:
-                        # Fallback to serverless if provider is not supported
-                        client = InferenceClient(
-                            token=self.api_key,
-                        )
+                # Reuse one InferenceClient per provider
+                client = self._get_client(provider)
 
                 # Create the completion with structured output format using synchronous call in async context
-                response = await asyncio.to_thread(
+                response = await self._run_blocking(
                     client.chat_completion,
                     model=model_id,
-                    messages=[
-                        {
-                            "role": "user",
-                            "content": "What's the weather like in London?",
-                        }
-                    ],
-                    response_format={
-                        "type": "json_schema",
-                        "json_schema": {
-                            "name": "weather",
-                            "strict": True,
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "location": {
-                                        "type": "string",
-                                        "description": "City or location name",
-                                    },
-                                    "temperature": {
-                                        "type": "number",
-                                        "description": "Temperature in Celsius",
-                                    },
-                                    "conditions": {
-                                        "type": "string",
-                                        "description": "Weather conditions description",
-                                    },
-                                },
-                                "required": ["location", "temperature", "conditions"],
-                                "additionalProperties": False,
-                            },
-                        },
-                    },
-                    max_tokens=1000,
-                    )
+                    messages=STRUCTURED_MESSAGES,
+                    response_format=WEATHER_RESPONSE_FORMAT,
+                    max_tokens=MAX_TOKENS,
+                )
 
                 # Extract debugging information
                 message = response.choices[0].message
@@ -328,7 +412,7 @@ class HuggingFaceToolSupportChecker:
                 if message.content:
                     result["response_content"] = message.content
                     try:
-                        json_response = json.loads(message.content)
+                        json_response = json_loads(message.content)
                         if all(
                             key in json_response
                             for key in ["location", "temperature", "conditions"]
@@ -412,6 +496,7 @@ class HuggingFaceToolSupportChecker:
             provider_results[provider_name]["test_runs"].append(results[i])
 
         # Process and format results
+        n_providers = len(providers)
         final_results = []
         for i, (provider_name, data) in enumerate(provider_results.items(), 1):
             provider = data["provider"]
@@ -424,13 +509,16 @@ class HuggingFaceToolSupportChecker:
             unclear_count = sum(1 for r in test_runs if r["status"] == "unclear")
             fail_count = 3 - success_count - error_count - unclear_count
 
-            # Display results
-            print(f"\n[{i}/{len(providers)}] {display_name}:")
-            print(f"  Summary: {success_count}/3 successful")
+            # Display results with a single write per provider
+            lines = [
+                f"\n[{i}/{n_providers}] {display_name}:",
+                f"  Summary: {success_count}/3 successful",
+            ]
             if error_count > 0:
-                print(f"  Errors: {error_count}/3")
+                lines.append(f"  Errors: {error_count}/3")
             if unclear_count > 0:
-                print(f"  Unclear: {unclear_count}/3")
+                lines.append(f"  Unclear: {unclear_count}/3")
+            print("\n".join(lines))
 
             final_results.append(
                 {
@@ -503,6 +591,7 @@ class HuggingFaceToolSupportChecker:
             provider_results[provider_name]["test_runs"].append(results[i])
 
         # Process and format results
+        n_providers = len(providers)
         final_results = []
         for i, (provider_name, data) in enumerate(provider_results.items(), 1):
             provider = data["provider"]
@@ -517,13 +606,16 @@ class HuggingFaceToolSupportChecker:
                 1 for r in test_runs if r["status"] == "no_tool_call"
             )
 
-            # Display results
-            print(f"\n[{i}/{len(providers)}] {display_name}:")
-            print(f"  Summary: {success_count}/3 successful")
+            # Display results with a single write per provider
+            lines = [
+                f"\n[{i}/{n_providers}] {display_name}:",
+                f"  Summary: {success_count}/3 successful",
+            ]
             if error_count > 0:
-                print(f"  Errors: {error_count}/3")
+                lines.append(f"  Errors: {error_count}/3")
             if unclear_count > 0:
-                print(f"  Unclear: {unclear_count}/3")
+                lines.append(f"  Unclear: {unclear_count}/3")
+            print("\n".join(lines))
 
             final_results.append(
                 {
@@ -587,6 +679,17 @@ async def main():
         "models": [],
     }
 
+    async def run_model(model_id: str) -> Dict[str, Any]:
+        # Run both tool support and structured output tests concurrently
+        tool_result, structured_result = await asyncio.gather(
+            checker.check_model(model_id),
+            checker.check_model_structured_output(model_id),
+        )
+
+        # Combine results
+        tool_result["structured_output"] = structured_result["providers"]
+        return tool_result
+
     # Process all models concurrently in batches
     batch_size = 2  # Process 2 models at a time to avoid overwhelming the API
     for i in range(0, len(models), batch_size):
@@ -595,27 +698,20 @@ async def main():
             f"\nProcessing batch {i // batch_size + 1}/{(len(models) + batch_size - 1) // batch_size}"
         )
 
-        # Create tasks for this batch
-        batch_tasks = []
-        for model_id in batch:
-            # Run both tool support and structured output tests concurrently
-            tool_task = checker.check_model(model_id)
-            structured_task = checker.check_model_structured_output(model_id)
-            batch_tasks.append((model_id, tool_task, structured_task))
-
-        # Execute batch
-        for model_id, tool_task, structured_task in batch_tasks:
-            tool_result = await tool_task
-            structured_result = await structured_task
-
-            # Combine results
-            tool_result["structured_output"] = structured_result["providers"]
-            all_results["models"].append(tool_result)
+        # Execute the whole batch concurrently; the semaphore caps the
+        # number of requests actually in flight
+        all_results["models"].extend(
+            await asyncio.gather(*(run_model(model_id) for model_id in batch))
+        )
 
     # Save final results
     final_output = "data_hf.json"
-    with open(final_output, "w") as f:
-        json.dump(all_results, f, indent=2)
+    if orjson is not None:
+        with open(final_output, "wb") as f:
+            f.write(orjson.dumps(all_results, option=orjson.OPT_INDENT_2))
+    else:
+        with open(final_output, "w") as f:
+            json.dump(all_results, f, indent=2)
 
     print(f"\n\nResults saved to: {final_output}")
 
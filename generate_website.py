@@ -3,370 +3,26 @@
 Generate a static website from the tool support test results.
 """
 
+import gzip
+import hashlib
 import json
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from collections import defaultdict
-
-
-def load_latest_results():
-    """Load the latest test results from JSON."""
-    results_file = "data.json"
-
-    if not os.path.exists(results_file):
-        print(f"Results file not found: {results_file}")
-        return None
-
-    with open(results_file, "r") as f:
-        return json.load(f)
-
-
-def load_hf_results():
-    """Load the latest Hugging Face test results from JSON."""
-    results_file = "data_hf.json"
-
-    if not os.path.exists(results_file):
-        print(f"HF results file not found: {results_file}")
-        return None
-
-    with open(results_file, "r") as f:
-        return json.load(f)
-
-
-def load_models_mapping():
-    """Load the models mapping file."""
-    models_file = "models.json"
-    
-    if not os.path.exists(models_file):
-        print(f"Models mapping file not found: {models_file}")
-        return {}
-    
-    with open(models_file, "r") as f:
-        return json.load(f)
-
-
-def group_models(models):
-    """Group models by base name (e.g., group 'model' and 'model:free' together)."""
-    grouped = defaultdict(list)
-
-    for model in models:
-        model_id = model["model_id"]
-        # Extract base model name (before :free or other suffixes)
-        base_name = model_id.split(":")[0]
-        grouped[base_name].append(model)
-
-    return grouped
-
-
-def create_unified_model_list(or_results, hf_results, models_mapping):
-    """Create a unified list of models with user-friendly names and platform suffixes."""
-    unified_models = []
-    
-    # Create a reverse mapping from model IDs to user-friendly names (for HF mainly now)
-    id_to_name_hf = {}
-    for friendly_name, platforms in models_mapping.items():
-        for hf_id in platforms.get("huggingface", []):
-            id_to_name_hf[hf_id] = (friendly_name, "HF")
-
-    # Process OpenRouter results by iterating through models_mapping
-    if or_results:
-        or_models_data_map = {m["model_id"]: m for m in or_results.get("models", [])}
-
-        for friendly_name, platforms in models_mapping.items():
-            or_ids = platforms.get("openrouter", [])
-            if not or_ids:
-                continue
-
-            model_data_variants = {}
-            actual_model_id_for_sort = None
-            has_regular_variant_defined = False
-            has_free_variant_defined = False
-
-            # Check for regular (non-free) and free variants based on suffix
-            # Assumes models.json lists specific IDs like 'model/name' and 'model/name:free'
-            regular_id_found = None
-            free_id_found = None
-
-            for or_id in or_ids:
-                if or_id.endswith(":free"):
-                    if not free_id_found: # Take first free ID
-                        free_id_found = or_id 
-                        has_free_variant_defined = True
-                else:
-                    if not regular_id_found: # Take first regular ID
-                        regular_id_found = or_id
-                        has_regular_variant_defined = True
-            
-            if regular_id_found and regular_id_found in or_models_data_map:
-                model_data_variants["regular"] = or_models_data_map[regular_id_found]
-                actual_model_id_for_sort = regular_id_found
-            
-            if free_id_found and free_id_found in or_models_data_map:
-                model_data_variants["free"] = or_models_data_map[free_id_found]
-                if not actual_model_id_for_sort:
-                    actual_model_id_for_sort = free_id_found
-            
-            if model_data_variants: # If data found for at least one variant
-                # Store whether variants were defined, to distinguish from single-entry models later
-                model_data_variants['_has_regular_defined'] = has_regular_variant_defined
-                model_data_variants['_has_free_defined'] = has_free_variant_defined
-
-                unified_models.append({
-                    "display_name": f"{friendly_name} (OR)",
-                    "platform": "OR",
-                    "model_data": model_data_variants, # Dict: {"regular": ..., "free": ..., "_has_..."}
-                    "sort_key": (friendly_name, "OR", actual_model_id_for_sort if actual_model_id_for_sort else "") 
-                })
-    
-    # Process HuggingFace results (largely unchanged)
-    if hf_results:
-        for model_data in hf_results.get("models", []) :
-            model_id = model_data["model_id"]
-            if model_id in id_to_name_hf:
-                friendly_name, _ = id_to_name_hf[model_id]
-                unified_models.append({
-                    "display_name": f"{friendly_name} (HF)",
-                    "platform": "HF",
-                    "model_data": model_data, # Direct model_data for HF
-                    "sort_key": (friendly_name, "HF", model_id)
-                })
-    
-    # Sort by friendly name, then platform
-    unified_models.sort(key=lambda x: x["sort_key"])
-    
-    return unified_models
-
-
-def normalize_provider_names_in_results(results_data):
-    """Normalize provider names to lowercase in the results data."""
-    if not results_data or "models" not in results_data:
-        return
-
-    for model_idx, model in enumerate(results_data["models"]):
-        # Normalize in 'providers' list
-        if "providers" in model and isinstance(model["providers"], list):
-            for provider_idx, provider_info in enumerate(model["providers"]):
-                if isinstance(provider_info, dict) and "provider_name" in provider_info and provider_info["provider_name"]:
-                    # Ensure in-place modification
-                    normalized_name = str(provider_info["provider_name"]).lower()
-                    if normalized_name == "fireworks-ai":
-                        normalized_name = "fireworks"
-                    results_data["models"][model_idx]["providers"][provider_idx]["provider_name"] = normalized_name
-        
-        # Normalize in 'structured_output' list (if it exists)
-        if "structured_output" in model and isinstance(model["structured_output"], list):
-             for provider_idx, provider_info in enumerate(model["structured_output"]):
-                if isinstance(provider_info, dict) and "provider_name" in provider_info and provider_info["provider_name"]:
-                    # Ensure in-place modification
-                    normalized_name = str(provider_info["provider_name"]).lower()
-                    if normalized_name == "fireworks-ai":
-                        normalized_name = "fireworks"
-                    results_data["models"][model_idx]["structured_output"][provider_idx]["provider_name"] = normalized_name
-
-
-def get_all_providers(results):
-    """Get a sorted list of all unique providers across all models."""
-    providers = set()
-
-    for model in results["models"]:
-        for provider in model["providers"]:
-            providers.add(provider["provider_name"])
-
-    return sorted(list(providers))
-
-
-def has_structured_output_data(results):
-    """Check if the results contain structured output test data."""
-    if not results or "models" not in results:
-        return False
-
-    # Check if any model has structured_output data
-    for model in results["models"]:
-        if "structured_output" in model:
-            return True
-
-    return False
-
-
-# Helper function to get status for a single model variant
-def _get_single_model_provider_status(single_model_data, provider_name, data_type="tool_support"):
-    """Get the status for a specific model-provider combination for a single model data object."""
-    if not single_model_data: # Added check for None
-        return "none", "-", None
-
-    providers_list_key = ""
-    if data_type == "structured_output":
-        if "structured_output" in single_model_data:
-            providers_list_key = "structured_output"
-        else:
-            # If requesting structured_output and the key doesn't exist for this model variant,
-            # then there's no SO data for it.
-            return "none", "-", None 
-    else: # data_type == "tool_support" (or default)
-        # For tool_support, we assume the 'providers' key should exist if single_model_data is valid.
-        # If it's missing, the check below will handle it.
-        providers_list_key = "providers"
-    
-    if providers_list_key not in single_model_data or not single_model_data[providers_list_key]:
-        return "none", "-", None
-
-    providers_list = single_model_data[providers_list_key]
-
-    for provider in providers_list:
-        if provider["provider_name"] == provider_name:
-            summary = provider.get("summary", {})
-            success_count = summary.get("success_count", -1) # Default to -1 if not found
-
-            if success_count == -1: # Provider listed but no summary/success_count
-                 return "none", "?", ["Missing summary data"]
-
-            # Determine status and details
-            if success_count == 3:
-                return "success", f"{success_count}/3", None
-            elif success_count == 0:
-                reasons = []
-                for run in provider.get("test_runs", []) :
-                    if run.get("status") == "error" and run.get("error"):
-                        error = str(run["error"])[:100]
-                        if error not in reasons:
-                            reasons.append(error)
-                    elif run.get("status") == "unclear":
-                        reasons.append("Empty response")
-                    elif run.get("status") in ["no_tool_call", "invalid_json", "invalid_schema"]:
-                        if run.get("response_content"):
-                            reasons.append(
-                                f"No proper response: {str(run['response_content'])[:50]}..."
-                            )
-                        else:
-                            reasons.append("No proper response (empty)")
-                return "failure", f"{success_count}/3", reasons if reasons else ["Unknown failure"]
-            else: # Partial success (1 or 2)
-                reasons = []
-                for run in provider.get("test_runs", []) :
-                    if run.get("status") != "success":
-                        if run.get("status") == "error" and run.get("error"):
-                            reasons.append(f"Error: {str(run['error'])[:50]}...")
-                        elif run.get("status") == "unclear":
-                            reasons.append("Empty response")
-                        elif run.get("status") in ["no_tool_call", "invalid_json", "invalid_schema"]:
-                            reasons.append("Invalid response format")
-                return "partial", f"{success_count}/3", reasons if reasons else ["Unknown partial failure"]
-
-    return "none", "-", None # Provider not found for this model
-
-
-def get_cell_status(model_data_container, provider_name, data_type="tool_support"):
-    """Get the status for a specific model-provider combination.
-
-    Args:
-        model_data_container: For HF, the model data dict. For OR, a dict like 
-                              {'regular': data, 'free': data, '_has_regular_defined': bool, '_has_free_defined': bool}.
-        provider_name: The provider name to check.
-        data_type: Either "tool_support" (default) or "structured_output".
-    """
-    # Check if it's an OpenRouter model with variants structure
-    if isinstance(model_data_container, dict) and ('regular' in model_data_container or 'free' in model_data_container):
-        reg_data = model_data_container.get("regular")
-        free_data = model_data_container.get("free")
-        has_regular_defined = model_data_container.get('_has_regular_defined', False)
-        has_free_defined = model_data_container.get('_has_free_defined', False)
-
-        status_reg, text_reg, reasons_reg = _get_single_model_provider_status(reg_data, provider_name, data_type)
-        status_free, text_free, reasons_free = _get_single_model_provider_status(free_data, provider_name, data_type)
-
-        # Determine if data exists for this provider for each variant
-        has_reg_provider_data = status_reg != "none"
-        has_free_provider_data = status_free != "none"
-
-        # Case 1: Only one variant type was defined in models.json for this model (e.g. only paid, no free counterpart)
-        if has_regular_defined and not has_free_defined:
-            return status_reg, text_reg, reasons_reg
-        if has_free_defined and not has_regular_defined:
-            return status_free, text_free, reasons_free
-        
-        # Case 2: Both variant types defined in models.json, now combine their provider status
-        combined_text_parts = []
-        if has_reg_provider_data:
-            combined_text_parts.append(text_reg)
-        if has_free_provider_data:
-            combined_text_parts.append(text_free)
-        
-        final_text = " | ".join(combined_text_parts) if combined_text_parts else "-"
-
-        # Determine overall status class (prioritize success > partial > failure > none)
-        status_priority = {"success": 4, "partial": 3, "failure": 2, "none": 1}
-        final_status = "none"
-        # If either is success, final is success. If either is partial (and none success), final is partial etc.
-        if status_reg == "success" or status_free == "success":
-            final_status = "success"
-        elif status_reg == "partial" or status_free == "partial":
-            final_status = "partial"
-        elif status_reg == "failure" or status_free == "failure":
-            final_status = "failure"
-        else: # both are none or undefined
-            final_status = "none"
-        
-        if not has_reg_provider_data and not has_free_provider_data:
-            final_status = "none" # Ensure if no data for provider from either, it's 'none'
-            final_text = "-"
-
-        combined_reasons = []
-        if reasons_reg:
-            combined_reasons.extend(reasons_reg)
-        if reasons_free:
-            combined_reasons.extend(reasons_free)
-            
-        return final_status, final_text, combined_reasons if combined_reasons else None
-    else:
-        # Fallback for HF models or non-variant OR models (should be direct model_data object)
-        return _get_single_model_provider_status(model_data_container, provider_name, data_type)
-
-
-def format_reasons_for_tooltip(reasons):
-    """Format reasons for tooltip, escaping HTML-sensitive characters."""
-    if not reasons:
-        return ""
-    # Escape single quotes, double quotes, and ampersands for HTML attribute
-    return (
-        " | ".join(reasons)
-        .replace("&", "&amp;")
-        .replace("'", "&apos;")
-        .replace('"', "&quot;")
-    )
-
-
-def generate_html(results, hf_results=None):
-    """Generate the HTML content for the website."""
-    # Load models mapping
-    models_mapping = load_models_mapping()
-    
-    # Use the most recent timestamp
-    timestamps = []
-    if results:
-        timestamps.append(results.get("generated_at", datetime.now().isoformat()))
-    if hf_results:
-        timestamps.append(hf_results.get("generated_at", datetime.now().isoformat()))
-    
-    generated_at = max(timestamps) if timestamps else datetime.now().isoformat()
-    generated_at = datetime.fromisoformat(generated_at).strftime("%Y-%m-%d %H:%M UTC")
-
-    # Create unified model list
-    unified_models = create_unified_model_list(results, hf_results, models_mapping)
-    
-    # Get all providers from both platforms
-    or_providers = get_all_providers(results) if results else []
-    hf_providers = get_all_providers(hf_results) if hf_results else []
-    all_providers = sorted(list(set(or_providers + hf_providers)))
-    
-    # Check if structured output data is available
-    has_structured_data = False
-    if results:
-        has_structured_data = has_structured_data or has_structured_output_data(results)
-    if hf_results:
-        has_structured_data = has_structured_data or has_structured_output_data(hf_results)
-
-    # CSS styles - add tab styles if we have structured output data
-    style_sheet = """<style>
+from operator import itemgetter
+
+# orjson parses the multi-megabyte result files several times faster than
+# stdlib json; fall back silently since it is not part of the locked
+# dependency set
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Static page fragments. Everything that does not depend on the data is
+# defined once at module scope so iter_html only assembles the
+# data-driven rows. The CSS is served as its own cacheable file.
+_STYLE_CSS = """
         body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
             line-height: 1.4; /* Further reduced line height */
@@ -576,21 +232,463 @@ def generate_html(results, hf_results=None):
             margin: 10px 0;
             color: #2c3e50;
         }
-    </style>"""
+"""
 
-    # HTML Structure
-    html_start = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>OpenRouter & HuggingFace Tool Support Matrix</title>
-    {style_sheet}
-</head>
-<body>
-    <div class="container">
-        <h1>AI Model Support Matrix</h1>
-        <p class="subtitle">Last updated: {generated_at}</p>
+# Per-status cell markup, precomputed so the row loop only appends the
+# status text between constant fragments
+_CELL_OPEN = {
+    "success": "<td class='provider-cell'><span class='cell success'>",
+    "partial": "<td class='provider-cell'><span class='cell partial'>",
+    "failure": "<td class='provider-cell'><span class='cell failure'>",
+}
+_CELL_CLOSE = "</span></td>"
+_EMPTY_CELL = "<td class='provider-cell'><span class='cell none'>-</span></td>"
+
+# Bound format method of the constant row-opening template; one C call
+# per row instead of an f-string
+_ROW_OPEN = "<tr><td class='model-name-cell'>{}</td>".format
+
+_TABS_HTML = """
+        <div class="tabs">
+            <div class="tab active" id="tab-tool-support">Tool Support</div>
+            <div class="tab" id="tab-structured-output">Structured Output</div>
+        </div>
+        
+        <div class="tab-content active" id="content-tool-support">
+"""
+
+_FOOTER_HTML = """
+        <br>
+        Sometimes, the model (or the provider) does not properly call tools or return structured output. That's why every call is made three times.<br>
+        The code to generate this website is available on <a href="https://github.com/Xeophon/openrouter-tool-check" target="_blank">GitHub</a>.
+        
+        <div class="footer">
+            <p>Generated automatically by <a href="https://github.com/Xeophon/openrouter-tool-check" target="_blank">AI Model Tool Support Tracker</a>.</p>
+            <p>Updates every 12 hours &bull; Data sources: <a href="https://openrouter.ai/docs/api-reference" target="_blank">OpenRouter API</a> & <a href="https://huggingface.co/docs/api-inference" target="_blank">HuggingFace Inference API</a></p>
+        </div>
+    </div>
+
+    <!-- JavaScript for tab switching -->
+    <script>
+        document.addEventListener('DOMContentLoaded', function() {
+            const tabs = document.querySelectorAll('.tab');
+            const tabContents = document.querySelectorAll('.tab-content');
+            
+            tabs.forEach(tab => {
+                tab.addEventListener('click', function() {
+                    // Remove active class from all tabs and content
+                    tabs.forEach(t => t.classList.remove('active'));
+                    tabContents.forEach(c => c.classList.remove('active'));
+                    
+                    // Add active class to clicked tab
+                    this.classList.add('active');
+                    
+                    // Show corresponding content
+                    const contentId = this.id.replace('tab', 'content');
+                    document.getElementById(contentId).classList.add('active');
+                });
+            });
+        });
+    </script>
+</body>
+</html>"""
+
+
+def load_latest_results():
+    """Load the latest test results from JSON."""
+    results_file = "data.json"
+
+    try:
+        with open(results_file, "rb") as f:
+            return orjson.loads(f.read()) if orjson is not None else json.load(f)
+    except FileNotFoundError:
+        print(f"Results file not found: {results_file}")
+        return None
+
+
+def load_hf_results():
+    """Load the latest Hugging Face test results from JSON."""
+    results_file = "data_hf.json"
+
+    try:
+        with open(results_file, "rb") as f:
+            return orjson.loads(f.read()) if orjson is not None else json.load(f)
+    except FileNotFoundError:
+        print(f"HF results file not found: {results_file}")
+        return None
+
+
+def load_models_mapping():
+    """Load the models mapping file."""
+    models_file = "models.json"
+
+    try:
+        with open(models_file, "rb") as f:
+            return orjson.loads(f.read()) if orjson is not None else json.load(f)
+    except FileNotFoundError:
+        print(f"Models mapping file not found: {models_file}")
+        return {}
+
+
+def group_models(models):
+    """Group models by base name (e.g., group 'model' and 'model:free' together)."""
+    grouped = {}
+
+    for model in models:
+        # Extract base model name (before :free or other suffixes);
+        # partition stops at the first separator without building a list
+        base_name = model["model_id"].partition(":")[0]
+        bucket = grouped.get(base_name)
+        if bucket is None:
+            grouped[base_name] = bucket = []
+        bucket.append(model)
+
+    return grouped
+
+
+def create_unified_model_list(or_results, hf_results, models_mapping):
+    """Create a unified list of models with user-friendly names and platform suffixes."""
+    unified_models = []
+    
+    # Create a reverse mapping from model IDs to user-friendly names (for HF mainly now)
+    id_to_name_hf = {}
+    for friendly_name, platforms in models_mapping.items():
+        for hf_id in platforms.get("huggingface", []):
+            id_to_name_hf[hf_id] = (friendly_name, "HF")
+
+    # Process OpenRouter results by iterating through models_mapping
+    if or_results:
+        or_models_data_map = {m["model_id"]: m for m in or_results.get("models", [])}
+
+        for friendly_name, platforms in models_mapping.items():
+            or_ids = platforms.get("openrouter", [])
+            if not or_ids:
+                continue
+
+            model_data_variants = {}
+            actual_model_id_for_sort = None
+            has_regular_variant_defined = False
+            has_free_variant_defined = False
+
+            # Check for regular (non-free) and free variants based on suffix
+            # Assumes models.json lists specific IDs like 'model/name' and 'model/name:free'
+            regular_id_found = None
+            free_id_found = None
+
+            for or_id in or_ids:
+                if or_id.endswith(":free"):
+                    if not free_id_found: # Take first free ID
+                        free_id_found = or_id 
+                        has_free_variant_defined = True
+                else:
+                    if not regular_id_found: # Take first regular ID
+                        regular_id_found = or_id
+                        has_regular_variant_defined = True
+            
+            if regular_id_found and regular_id_found in or_models_data_map:
+                model_data_variants["regular"] = or_models_data_map[regular_id_found]
+                actual_model_id_for_sort = regular_id_found
+            
+            if free_id_found and free_id_found in or_models_data_map:
+                model_data_variants["free"] = or_models_data_map[free_id_found]
+                if not actual_model_id_for_sort:
+                    actual_model_id_for_sort = free_id_found
+            
+            if model_data_variants: # If data found for at least one variant
+                # Store whether variants were defined, to distinguish from single-entry models later
+                model_data_variants['_has_regular_defined'] = has_regular_variant_defined
+                model_data_variants['_has_free_defined'] = has_free_variant_defined
+
+                unified_models.append({
+                    "display_name": f"{friendly_name} (OR)",
+                    "platform": "OR",
+                    "model_data": model_data_variants, # Dict: {"regular": ..., "free": ..., "_has_..."}
+                    "sort_key": (friendly_name, "OR", actual_model_id_for_sort if actual_model_id_for_sort else "") 
+                })
+    
+    # Process HuggingFace results (largely unchanged)
+    if hf_results:
+        for model_data in hf_results.get("models", []) :
+            model_id = model_data["model_id"]
+            if model_id in id_to_name_hf:
+                friendly_name, _ = id_to_name_hf[model_id]
+                unified_models.append({
+                    "display_name": f"{friendly_name} (HF)",
+                    "platform": "HF",
+                    "model_data": model_data, # Direct model_data for HF
+                    "sort_key": (friendly_name, "HF", model_id)
+                })
+    
+    # Sort by friendly name, then platform; itemgetter avoids a Python
+    # frame per comparison key
+    unified_models.sort(key=itemgetter("sort_key"))
+    
+    return unified_models
+
+
+def normalize_provider_names_in_results(results_data):
+    """Normalize provider names to lowercase in the results data."""
+    if not results_data or "models" not in results_data:
+        return
+
+    for model_idx, model in enumerate(results_data["models"]):
+        # Normalize in 'providers' list
+        if "providers" in model and isinstance(model["providers"], list):
+            for provider_idx, provider_info in enumerate(model["providers"]):
+                if isinstance(provider_info, dict) and "provider_name" in provider_info and provider_info["provider_name"]:
+                    # Ensure in-place modification
+                    normalized_name = str(provider_info["provider_name"]).lower()
+                    if normalized_name == "fireworks-ai":
+                        normalized_name = "fireworks"
+                    results_data["models"][model_idx]["providers"][provider_idx]["provider_name"] = normalized_name
+        
+        # Normalize in 'structured_output' list (if it exists)
+        if "structured_output" in model and isinstance(model["structured_output"], list):
+             for provider_idx, provider_info in enumerate(model["structured_output"]):
+                if isinstance(provider_info, dict) and "provider_name" in provider_info and provider_info["provider_name"]:
+                    # Ensure in-place modification
+                    normalized_name = str(provider_info["provider_name"]).lower()
+                    if normalized_name == "fireworks-ai":
+                        normalized_name = "fireworks"
+                    results_data["models"][model_idx]["structured_output"][provider_idx]["provider_name"] = normalized_name
+
+
+def get_all_providers(results):
+    """Get a sorted list of all unique providers across all models."""
+    return sorted(
+        {
+            provider["provider_name"]
+            for model in results["models"]
+            for provider in model["providers"]
+        }
+    )
+
+
+def has_structured_output_data(results):
+    """Check if the results contain structured output test data."""
+    if not results or "models" not in results:
+        return False
+
+    # any() short-circuits at the first model with structured output data
+    return any("structured_output" in model for model in results["models"])
+
+
+# Shared fast-path return values; most cells resolve to one of these two
+_NONE_TUPLE = ("none", "-")
+_SUCCESS_TUPLE = ("success", "3/3")
+
+# Score text by success count; a tuple index beats formatting a fresh
+# f-string per cell
+_SCORE = ("0/3", "1/3", "2/3", "3/3")
+
+# Row rendering is spread across processes only past this many models;
+# below it, worker spin-up and pickling cost more than they save
+_PARALLEL_RENDER_THRESHOLD = 64
+
+
+# Helper function to get status for a single model variant
+def _get_single_model_provider_status(single_model_data, provider_name, data_type="tool_support"):
+    """Get the status for a specific model-provider combination for a single model data object.
+
+    Returns a (status, cell text) pair. Most cells resolve to "no data" or
+    "full success"; those paths do only the index lookup and one integer
+    compare.
+    """
+    if not single_model_data: # Added check for None
+        return _NONE_TUPLE
+
+    if data_type == "structured_output":
+        # If the key doesn't exist for this model variant, there's no SO
+        # data for it.
+        providers_list_key = "structured_output"
+    else: # data_type == "tool_support" (or default)
+        providers_list_key = "providers"
+
+    if not single_model_data.get(providers_list_key):
+        return _NONE_TUPLE
+
+    # Index the provider list by name on first access and cache it on the
+    # model dict, so every later cell lookup for this model is O(1)
+    # instead of a linear scan
+    idx_key = "_" + providers_list_key + "_idx"
+    providers_index = single_model_data.get(idx_key)
+    if providers_index is None:
+        providers_index = {
+            p["provider_name"]: p for p in single_model_data[providers_list_key]
+        }
+        single_model_data[idx_key] = providers_index
+
+    provider = providers_index.get(provider_name)
+    if provider is None:
+        return _NONE_TUPLE  # Provider not found for this model
+
+    summary = provider.get("summary", {})
+    success_count = summary.get("success_count", -1) # Default to -1 if not found
+
+    if success_count == -1: # Provider listed but no summary/success_count
+        return "none", "?"
+
+    # Shortened retests of known negatives serialize fewer runs, so the
+    # run count comes from the summary rather than being assumed to be 3
+    total_runs = summary.get("total_runs", 3)
+    if total_runs == 3:
+        if success_count == 3:
+            return _SUCCESS_TUPLE
+        if success_count == 0:
+            return "failure", _SCORE[0]
+        # Partial success (1 or 2)
+        return "partial", _SCORE[success_count]
+
+    if success_count == total_runs:
+        return "success", f"{success_count}/{total_runs}"
+    if success_count == 0:
+        return "failure", f"0/{total_runs}"
+    return "partial", f"{success_count}/{total_runs}"
+
+def get_cell_status(model_data_container, provider_name, data_type="tool_support"):
+    """Get the status for a specific model-provider combination.
+
+    Args:
+        model_data_container: For HF, the model data dict. For OR, a dict like 
+                              {'regular': data, 'free': data, '_has_regular_defined': bool, '_has_free_defined': bool}.
+        provider_name: The provider name to check.
+        data_type: Either "tool_support" (default) or "structured_output".
+    """
+    # Check if it's an OpenRouter model with variants structure
+    if isinstance(model_data_container, dict) and ('regular' in model_data_container or 'free' in model_data_container):
+        reg_data = model_data_container.get("regular")
+        free_data = model_data_container.get("free")
+        has_regular_defined = model_data_container.get('_has_regular_defined', False)
+        has_free_defined = model_data_container.get('_has_free_defined', False)
+
+        status_reg, text_reg = _get_single_model_provider_status(reg_data, provider_name, data_type)
+        status_free, text_free = _get_single_model_provider_status(free_data, provider_name, data_type)
+
+        # Determine if data exists for this provider for each variant
+        has_reg_provider_data = status_reg != "none"
+        has_free_provider_data = status_free != "none"
+
+        # Case 1: Only one variant type was defined in models.json for this model (e.g. only paid, no free counterpart)
+        if has_regular_defined and not has_free_defined:
+            return status_reg, text_reg
+        if has_free_defined and not has_regular_defined:
+            return status_free, text_free
+        
+        # Case 2: Both variant types defined in models.json, now combine their provider status
+        combined_text_parts = []
+        if has_reg_provider_data:
+            combined_text_parts.append(text_reg)
+        if has_free_provider_data:
+            combined_text_parts.append(text_free)
+        
+        final_text = " | ".join(combined_text_parts) if combined_text_parts else "-"
+
+        # Determine overall status class (prioritize success > partial > failure > none)
+        status_priority = {"success": 4, "partial": 3, "failure": 2, "none": 1}
+        final_status = max(status_reg, status_free, key=lambda s: status_priority.get(s, 0))
+        
+        if not has_reg_provider_data and not has_free_provider_data:
+            final_status = "none" # Ensure if no data for provider from either, it's 'none'
+            final_text = "-"
+
+        return final_status, final_text
+    else:
+        # Fallback for HF models or non-variant OR models (should be direct model_data object)
+        return _get_single_model_provider_status(model_data_container, provider_name, data_type)
+
+
+def _render_model_rows(args):
+    """Render one model's rows for both tables.
+
+    Takes a single args tuple and lives at module scope so it can be
+    pickled into worker processes for large matrices.
+    """
+    display_name, model_data, all_providers, has_structured_data = args
+
+    tool_row = [_ROW_OPEN(display_name)]
+    struct_row = [_ROW_OPEN(display_name)] if has_structured_data else None
+
+    for provider_name in all_providers:
+        # get_cell_status handles both the OR variant containers and the
+        # direct HF model dicts
+        status, text = get_cell_status(model_data, provider_name, "tool_support")
+
+        if status != "none":
+            tool_row.append(_CELL_OPEN[status])
+            tool_row.append(text)
+            tool_row.append(_CELL_CLOSE)
+        else:
+            tool_row.append(_EMPTY_CELL)
+
+        if has_structured_data:
+            status, text = get_cell_status(
+                model_data, provider_name, "structured_output"
+            )
+
+            if status != "none":
+                struct_row.append(_CELL_OPEN[status])
+                struct_row.append(text)
+                struct_row.append(_CELL_CLOSE)
+            else:
+                struct_row.append(_EMPTY_CELL)
+
+    tool_row.append("</tr>")
+    if has_structured_data:
+        struct_row.append("</tr>")
+        return "".join(tool_row), "".join(struct_row)
+    return "".join(tool_row), ""
+
+
+def iter_html(results, hf_results=None, models_mapping=None):
+    """Yield the website HTML as a stream of chunks.
+
+    The tool-support table streams one row at a time so the whole page is
+    never held in memory at once; only the structured-output rows are
+    buffered, since they are built during the same traversal but emitted
+    later in the document.
+    """
+    # Load models mapping unless the caller already has it
+    if models_mapping is None:
+        models_mapping = load_models_mapping()
+    
+    # Use the most recent timestamp
+    timestamps = []
+    if results:
+        timestamps.append(results.get("generated_at", datetime.now().isoformat()))
+    if hf_results:
+        timestamps.append(hf_results.get("generated_at", datetime.now().isoformat()))
+    
+    generated_at = max(timestamps) if timestamps else datetime.now().isoformat()
+    generated_at = datetime.fromisoformat(generated_at).strftime("%Y-%m-%d %H:%M UTC")
+
+    # Create unified model list
+    unified_models = create_unified_model_list(results, hf_results, models_mapping)
+    
+    # Get all providers from both platforms
+    or_providers = get_all_providers(results) if results else []
+    hf_providers = get_all_providers(hf_results) if hf_results else []
+    all_providers = sorted(list(set(or_providers + hf_providers)))
+    
+    # Check if structured output data is available
+    has_structured_data = False
+    if results:
+        has_structured_data = has_structured_data or has_structured_output_data(results)
+    if hf_results:
+        has_structured_data = has_structured_data or has_structured_output_data(hf_results)
+
+    # HTML Structure
+    html_start = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>OpenRouter & HuggingFace Tool Support Matrix</title>
+    <link rel="stylesheet" href="style.css">
+</head>
+<body>
+    <div class="container">
+        <h1>AI Model Support Matrix</h1>
+        <p class="subtitle">Last updated: {generated_at}</p>
         
         <div class="legend">
             <div class="legend-item"><span class="legend-color success-swatch"></span>Full support (3/3)</div>
@@ -602,14 +700,7 @@ def generate_html(results, hf_results=None):
 
     # If we have structured output data, create tabs to toggle between reports
     if has_structured_data:
-        html_start += """
-        <div class="tabs">
-            <div class="tab active" id="tab-tool-support">Tool Support</div>
-            <div class="tab" id="tab-structured-output">Structured Output</div>
-        </div>
-        
-        <div class="tab-content active" id="content-tool-support">
-"""
+        html_start += _TABS_HTML
 
     # Provider Headers - reused for both tables
     provider_headers = ""
@@ -628,56 +719,42 @@ def generate_html(results, hf_results=None):
                 <tbody>
 """
 
-    # Table Rows for Tool Support
-    tool_support_rows_html = ""
-    for unified_model in unified_models:
-        display_name = unified_model["display_name"]
-        model_data = unified_model["model_data"]
-        platform = unified_model["platform"]
-        
-        tool_support_rows_html += f"<tr><td class='model-name-cell'>{display_name}</td>"
-
-        for provider_name in all_providers:
-            # Check if this provider is relevant for this platform
-            if platform == "OR":
-                # For OpenRouter models, use the existing logic
-                status, text, reasons = get_cell_status(
-                    model_data, provider_name, "tool_support"
-                )
-            elif platform == "HF":
-                # For HuggingFace models, use the existing logic
-                status, text, reasons = get_cell_status(
-                    model_data, provider_name, "tool_support"
-                )
-            else:
-                status = "none"
-                text = "-"
-                reasons = None
-
-            if status != "none":
-                tool_support_rows_html += (
-                    f"<td class='provider-cell'>"
-                    f"<span class='cell {status}'>{text}</span>"
-                    f"</td>"
-                )
-            else:
-                tool_support_rows_html += (
-                    "<td class='provider-cell'><span class='cell none'>-</span></td>"
-                )
+    yield html_start
+
+    # Table Rows: each model renders both of its rows in one pass; rows go
+    # through a process pool only when the matrix is large enough for the
+    # fan-out to pay for itself
+    row_args = [
+        (
+            unified_model["display_name"],
+            unified_model["model_data"],
+            all_providers,
+            has_structured_data,
+        )
+        for unified_model in unified_models
+    ]
+    if len(row_args) > _PARALLEL_RENDER_THRESHOLD:
+        with ProcessPoolExecutor() as pool:
+            rendered_rows = list(pool.map(_render_model_rows, row_args))
+    else:
+        rendered_rows = map(_render_model_rows, row_args)
 
-        tool_support_rows_html += "</tr>"
+    struct_rows = []
+    for tool_row_html, struct_row_html in rendered_rows:
+        yield tool_row_html
+        if has_structured_data:
+            struct_rows.append(struct_row_html)
 
     # Close tool support table
-    tool_support_table_end = """
+    yield """
                 </tbody>
             </table>
         </div>
 """
 
-    # If we have structured output data, create a structured output table
-    structured_output_html = ""
+    # If we have structured output data, emit the structured output table
     if has_structured_data:
-        structured_output_html = """
+        yield """
         </div> <!-- End tool support tab content -->
         
         <div class="tab-content" id="content-structured-output">
@@ -691,36 +768,11 @@ def generate_html(results, hf_results=None):
                     <tbody>
 """
 
-        # Table Rows for Structured Output using unified model list
-        for unified_model in unified_models:
-            display_name = unified_model["display_name"]
-            model_data = unified_model["model_data"]
-            platform = unified_model["platform"]
-            
-            structured_output_html += f"<tr><td class='model-name-cell'>{display_name}</td>"
-
-            for provider_name in all_providers:
-                # The get_cell_status function already handles checking for structured_output
-                # in the right place (variant data for OR, direct for HF)
-                status, text, reasons = get_cell_status(
-                    model_data, provider_name, "structured_output"
-                )
-
-                if status != "none":
-                    structured_output_html += (
-                        f"<td class='provider-cell'>"
-                        f"<span class='cell {status}'>{text}</span>"
-                        f"</td>"
-                    )
-                else:
-                    structured_output_html += (
-                        "<td class='provider-cell'><span class='cell none'>-</span></td>"
-                    )
-
-            structured_output_html += "</tr>"
+        # Rows were built alongside the tool-support ones above
+        yield "".join(struct_rows)
 
         # Close structured output table
-        structured_output_html += """
+        yield """
                     </tbody>
                 </table>
             </div>
@@ -728,62 +780,53 @@ def generate_html(results, hf_results=None):
 """
 
     # Footer content
-    footer_html = """
-        <br>
-        Sometimes, the model (or the provider) does not properly call tools or return structured output. That's why every call is made three times.<br>
-        The code to generate this website is available on <a href="https://github.com/Xeophon/openrouter-tool-check" target="_blank">GitHub</a>.
-        
-        <div class="footer">
-            <p>Generated automatically by <a href="https://github.com/Xeophon/openrouter-tool-check" target="_blank">AI Model Tool Support Tracker</a>.</p>
-            <p>Updates every 12 hours &bull; Data sources: <a href="https://openrouter.ai/docs/api-reference" target="_blank">OpenRouter API</a> & <a href="https://huggingface.co/docs/api-inference" target="_blank">HuggingFace Inference API</a></p>
-        </div>
-    </div>
+    yield _FOOTER_HTML
 
-    <!-- JavaScript for tab switching -->
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {
-            const tabs = document.querySelectorAll('.tab');
-            const tabContents = document.querySelectorAll('.tab-content');
-            
-            tabs.forEach(tab => {
-                tab.addEventListener('click', function() {
-                    // Remove active class from all tabs and content
-                    tabs.forEach(t => t.classList.remove('active'));
-                    tabContents.forEach(c => c.classList.remove('active'));
-                    
-                    // Add active class to clicked tab
-                    this.classList.add('active');
-                    
-                    // Show corresponding content
-                    const contentId = this.id.replace('tab', 'content');
-                    document.getElementById(contentId).classList.add('active');
-                });
-            });
-        });
-    </script>
-</body>
-</html>"""
 
-    # Combine all parts
-    if has_structured_data:
-        return (
-            html_start
-            + tool_support_rows_html
-            + tool_support_table_end
-            + structured_output_html
-            + footer_html
-        )
-    else:
-        return (
-            html_start
-            + tool_support_rows_html
-            + tool_support_table_end
-            + footer_html
-        )
+# The page is a function of these data files plus the generator itself;
+# their combined digest decides whether a rerun needs to render at all
+_INPUT_FILES = ("data.json", "data_hf.json", "models.json")
+_HASH_SIDECAR = "docs/.last_hash"
+
+
+def _inputs_digest():
+    """Fingerprint everything the rendered page depends on."""
+    h = hashlib.blake2b(digest_size=16)
+    for path in _INPUT_FILES:
+        try:
+            with open(path, "rb") as f:
+                h.update(f.read())
+        except FileNotFoundError:
+            h.update(b"\x00")
+    # Include this script's own source so edits to the templates or CSS
+    # invalidate the sidecar just like a data change would
+    with open(__file__, "rb") as f:
+        h.update(f.read())
+    return h.hexdigest()
+
+
+def _write_gzip_sidecar(path, data):
+    """Write a precompressed copy of data next to path as path.gz."""
+    # mtime=0 keeps the output deterministic so unchanged content does not
+    # produce a new file for CI to commit
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
 
 
 def main():
     """Main function to generate the website."""
+    # Skip the whole render when the inputs are byte-identical to the
+    # previous run -- the usual case for the scheduled regeneration
+    digest = _inputs_digest()
+    try:
+        with open(_HASH_SIDECAR) as f:
+            last_digest = f.read().strip()
+    except FileNotFoundError:
+        last_digest = None
+    if digest == last_digest and os.path.exists("docs/index.html"):
+        print("Inputs unchanged, skipping render.")
+        return
+
     print("Loading test results...")
     results = load_latest_results()
 
@@ -802,17 +845,32 @@ def main():
         normalize_provider_names_in_results(hf_results)
 
     models_mapping = load_models_mapping()
-    
+
     print("Generating HTML...")
-    html = generate_html(results, hf_results)
 
     # Create output directory
     os.makedirs("docs", exist_ok=True)
 
-    # Write HTML file
+    # The stylesheet is constant, so write it next to the page where the
+    # browser can cache it instead of re-downloading it inline every visit
+    with open("docs/style.css", "w") as f:
+        f.write(_STYLE_CSS)
+    _write_gzip_sidecar("docs/style.css", _STYLE_CSS.encode("utf-8"))
+
+    # Stream the HTML chunks straight to disk through a large buffer
+    # instead of materializing the whole page as one string first
     output_file = "docs/index.html"
-    with open(output_file, "w") as f:
-        f.write(html)
+    with open(output_file, "w", buffering=1 << 20) as f:
+        f.writelines(iter_html(results, hf_results, models_mapping))
+
+    # Precompress a .gz sidecar so a CDN or server that supports sidecar
+    # serving can skip on-the-fly compression entirely
+    with open(output_file, "rb") as f:
+        _write_gzip_sidecar(output_file, f.read())
+
+    # Record what was rendered so the next identical run can skip
+    with open(_HASH_SIDECAR, "w") as f:
+        f.write(digest)
 
     print(f"Website generated: {output_file}")
 